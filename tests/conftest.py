@@ -5,6 +5,8 @@ from pathlib import Path
 
 import pytest
 
+from yutto.utils.metadata_cache import MetaDataCache
+
 TEST_DIR = Path("./__test_files__")
 
 
@@ -15,3 +17,11 @@ def pytest_sessionstart(session: pytest.Session):
 def pytest_sessionfinish(session: pytest.Session, exitstatus: int):
     if TEST_DIR.exists():
         shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture(autouse=True)
+def isolate_metadata_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # 测试中默认关闭元数据缓存，并将缓存目录指向临时目录，避免读写用户真实的缓存
+    monkeypatch.setattr(MetaDataCache, "enabled", False)
+    monkeypatch.setattr(MetaDataCache, "refresh", False)
+    monkeypatch.setattr(MetaDataCache, "cache_dir", tmp_path / "metadata_cache")
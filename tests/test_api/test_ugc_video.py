@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterator
+
 import aiohttp
 import pytest
 
@@ -11,99 +14,88 @@ from yutto.api.ugc_video import (
     get_ugc_video_subtitles,
 )
 from yutto.utils.fetcher import Fetcher
-from yutto.utils.funcutils import as_sync
+
+
+# aiohttp 的 ClientSession 是绑定在事件循环上的，因此需要整个模块共用同一个事件循环，
+# 这样所有测试便可以复用同一个连接池，避免每个测试都重新进行 TLS 握手
+@pytest.fixture(scope="module")
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def session(loop: asyncio.AbstractEventLoop) -> Iterator[aiohttp.ClientSession]:
+    async def create_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            headers=Fetcher.headers,
+            cookies=Fetcher.cookies,
+            trust_env=Fetcher.trust_env,
+            timeout=aiohttp.ClientTimeout(total=5),
+            connector=aiohttp.TCPConnector(limit=20),
+        )
+
+    session = loop.run_until_complete(create_session())
+    yield session
+    loop.run_until_complete(session.close())
 
 
 @pytest.mark.api
 @pytest.mark.ci_skip
-@as_sync
-async def test_get_ugc_video_info():
+def test_get_ugc_video_info(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
     bvid = BvId("BV1q7411v7Vd")
     aid = AId("84271171")
     avid = bvid
     episode_id = EpisodeId("300998")
-    async with aiohttp.ClientSession(
-        headers=Fetcher.headers,
-        cookies=Fetcher.cookies,
-        trust_env=Fetcher.trust_env,
-        timeout=aiohttp.ClientTimeout(total=5),
-    ) as session:
-        video_info = await get_ugc_video_info(session, avid=avid)
-        assert video_info["avid"] == aid or video_info["avid"] == bvid
-        assert video_info["aid"] == aid
-        assert video_info["bvid"] == bvid
-        assert video_info["episode_id"] == episode_id
-        assert video_info["is_bangumi"] is True
-        assert video_info["cid"] == CId("144541892")
-        assert video_info["title"] == "【独播】我的三体之章北海传 第1集"
+    video_info = loop.run_until_complete(get_ugc_video_info(session, avid=avid))
+    assert video_info["avid"] == aid or video_info["avid"] == bvid
+    assert video_info["aid"] == aid
+    assert video_info["bvid"] == bvid
+    assert video_info["episode_id"] == episode_id
+    assert video_info["is_bangumi"] is True
+    assert video_info["cid"] == CId("144541892")
+    assert video_info["title"] == "【独播】我的三体之章北海传 第1集"
 
 
 @pytest.mark.api
-@as_sync
-async def test_get_ugc_video_title():
+def test_get_ugc_video_title(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
     avid = BvId("BV1vZ4y1M7mQ")
-    async with aiohttp.ClientSession(
-        headers=Fetcher.headers,
-        cookies=Fetcher.cookies,
-        trust_env=Fetcher.trust_env,
-        timeout=aiohttp.ClientTimeout(total=5),
-    ) as session:
-        title = (await get_ugc_video_list(session, avid))["title"]
-        assert title == "用 bilili 下载 B 站视频"
+    title = loop.run_until_complete(get_ugc_video_list(session, avid))["title"]
+    assert title == "用 bilili 下载 B 站视频"
 
 
 @pytest.mark.api
-@as_sync
-async def test_get_ugc_video_list():
+def test_get_ugc_video_list(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
     avid = BvId("BV1vZ4y1M7mQ")
-    async with aiohttp.ClientSession(
-        headers=Fetcher.headers,
-        cookies=Fetcher.cookies,
-        trust_env=Fetcher.trust_env,
-        timeout=aiohttp.ClientTimeout(total=5),
-    ) as session:
-        ugc_video_list = (await get_ugc_video_list(session, avid))["pages"]
-        assert ugc_video_list[0]["id"] == 1
-        assert ugc_video_list[0]["name"] == "bilili 特性以及使用方法简单介绍"
-        assert ugc_video_list[0]["cid"] == CId("222190584")
-        assert ugc_video_list[0]["metadata"] is not None
-        assert ugc_video_list[0]["metadata"]["title"] == "bilili 特性以及使用方法简单介绍"
-
-        assert ugc_video_list[1]["id"] == 2
-        assert ugc_video_list[1]["name"] == "bilili 环境配置方法"
-        assert ugc_video_list[1]["cid"] == CId("222200470")
-        assert ugc_video_list[1]["metadata"] is not None
-        assert ugc_video_list[1]["metadata"]["title"] == "bilili 环境配置方法"
+    ugc_video_list = loop.run_until_complete(get_ugc_video_list(session, avid))["pages"]
+    assert ugc_video_list[0]["id"] == 1
+    assert ugc_video_list[0]["name"] == "bilili 特性以及使用方法简单介绍"
+    assert ugc_video_list[0]["cid"] == CId("222190584")
+    assert ugc_video_list[0]["metadata"] is not None
+    assert ugc_video_list[0]["metadata"]["title"] == "bilili 特性以及使用方法简单介绍"
+
+    assert ugc_video_list[1]["id"] == 2
+    assert ugc_video_list[1]["name"] == "bilili 环境配置方法"
+    assert ugc_video_list[1]["cid"] == CId("222200470")
+    assert ugc_video_list[1]["metadata"] is not None
+    assert ugc_video_list[1]["metadata"]["title"] == "bilili 环境配置方法"
 
 
 @pytest.mark.api
 @pytest.mark.ci_skip
-@as_sync
-async def test_get_ugc_video_playurl():
+def test_get_ugc_video_playurl(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
     avid = BvId("BV1vZ4y1M7mQ")
     cid = CId("222190584")
-    async with aiohttp.ClientSession(
-        headers=Fetcher.headers,
-        cookies=Fetcher.cookies,
-        trust_env=Fetcher.trust_env,
-        timeout=aiohttp.ClientTimeout(total=5),
-    ) as session:
-        playlist = await get_ugc_video_playurl(session, avid, cid)
-        assert len(playlist[0]) > 0
-        assert len(playlist[1]) > 0
+    playlist = loop.run_until_complete(get_ugc_video_playurl(session, avid, cid))
+    assert len(playlist[0]) > 0
+    assert len(playlist[1]) > 0
 
 
 @pytest.mark.api
-@as_sync
-async def test_get_ugc_video_subtitles():
+def test_get_ugc_video_subtitles(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
     avid = BvId("BV1Ra411A7kN")
     cid = CId("253246252")
-    async with aiohttp.ClientSession(
-        headers=Fetcher.headers,
-        cookies=Fetcher.cookies,
-        trust_env=Fetcher.trust_env,
-        timeout=aiohttp.ClientTimeout(total=5),
-    ) as session:
-        subtitles = await get_ugc_video_subtitles(session, avid=avid, cid=cid)
-        assert len(subtitles) > 0
-        assert len(subtitles[0]["lines"]) > 0
+    subtitles = loop.run_until_complete(get_ugc_video_subtitles(session, avid=avid, cid=cid))
+    assert len(subtitles) > 0
+    assert len(subtitles[0]["lines"]) > 0
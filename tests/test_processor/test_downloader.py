@@ -5,7 +5,7 @@ import asyncio
 import aiohttp
 import pytest
 
-from yutto.processor.downloader import slice_blocks
+from yutto.processor.downloader import AdaptiveBlockSlicer, slice_blocks
 from yutto.utils.fetcher import Fetcher
 from yutto.utils.file_buffer import AsyncFileBuffer
 from yutto.utils.funcutils import as_sync
@@ -63,3 +63,29 @@ async def test_150_kB_no_slice_downloader():
             await asyncio.gather(*coroutines)
             print("下载完成！")
             assert size == file_path.stat().st_size, "文件大小与实际大小不符"
+
+
+@pytest.mark.processor
+def test_slice_blocks():
+    assert slice_blocks(0, None, 4) == [(0, None)]
+    assert slice_blocks(0, 10, None) == [(0, 9)]
+    assert slice_blocks(0, 8, 4) == [(0, 4), (4, 4)]
+    assert slice_blocks(0, 10, 4) == [(0, 4), (4, 4), (8, 2)]
+    assert slice_blocks(3, 10, 4) == [(3, 4), (7, 3)]
+    assert slice_blocks(10, 10, 4) == []
+
+
+@pytest.mark.processor
+def test_adaptive_block_slicer():
+    slicer = AdaptiveBlockSlicer(100, 10000, 300, 2000)
+    blocks: list[tuple[int, int]] = []
+    while (block := slicer.next_block()) is not None:
+        blocks.append(block)
+        slicer.feedback(block[1], 0.01)
+    assert blocks[0] == (100, 300)
+    assert all(300 <= size <= 2000 for _, size in blocks[:-1])
+    offset = 100
+    for start, size in blocks:
+        assert start == offset
+        offset += size
+    assert offset == 10000
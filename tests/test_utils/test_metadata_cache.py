@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import time
+
+import aiohttp
+import pytest
+
+import yutto.api.ugc_video
+from yutto._typing import AvId, BvId, CId
+from yutto.api.ugc_video import UgcVideoList, get_ugc_video_list
+from yutto.utils.funcutils import as_sync
+from yutto.utils.metadata import MetaData
+from yutto.utils.metadata_cache import MetaDataCache
+
+
+def create_ugc_video_list() -> UgcVideoList:
+    metadata = MetaData(
+        title="bilili 环境配置方法",
+        show_title="bilili 环境配置方法",
+        plot="",
+        thumb="",
+        premiered="2020-08-01",
+        dateadded="2020-08-01 00:00:00",
+        source="",
+        original_filename="",
+    )
+    return {
+        "title": "用 bilili 下载 B 站视频",
+        "avid": BvId("BV1vZ4y1M7mQ"),
+        "pubdate": "2020-08-01",
+        "pages": [
+            {
+                "id": 2,
+                "name": "bilili 环境配置方法",
+                "avid": BvId("BV1vZ4y1M7mQ"),
+                "cid": CId("222200470"),
+                "metadata": metadata,
+            }
+        ],
+    }
+
+
+@as_sync
+async def get_ugc_video_list_in_new_loop(avid: AvId) -> UgcVideoList:
+    # 每次调用都使用新的事件循环，模拟多次运行 yutto，此时只能通过磁盘缓存复用结果
+    async with aiohttp.ClientSession() as session:
+        return await get_ugc_video_list(session, avid)
+
+
+@pytest.mark.utils
+def test_ugc_video_list_cache_round_trip(monkeypatch: pytest.MonkeyPatch):
+    fetched_avids: list[AvId] = []
+
+    async def fake_fetch_ugc_video_list(session: aiohttp.ClientSession, avid: AvId) -> UgcVideoList:
+        fetched_avids.append(avid)
+        return create_ugc_video_list()
+
+    monkeypatch.setattr(MetaDataCache, "enabled", True)
+    monkeypatch.setattr(yutto.api.ugc_video, "_fetch_ugc_video_list", fake_fetch_ugc_video_list)
+    monkeypatch.setattr(yutto.api.ugc_video, "_ugc_video_list_tasks", {})
+
+    avid = BvId("BV1vZ4y1M7mQ")
+    assert get_ugc_video_list_in_new_loop(avid) == create_ugc_video_list()
+    cached_ugc_video_list = get_ugc_video_list_in_new_loop(avid)
+    assert fetched_avids == [avid]
+
+    # 除添加日期应为本次下载的日期外，其余内容应与写入缓存时保持一致
+    expected_ugc_video_list = create_ugc_video_list()
+    cached_metadata = cached_ugc_video_list["pages"][0]["metadata"]
+    expected_metadata = expected_ugc_video_list["pages"][0]["metadata"]
+    assert cached_metadata["dateadded"] != expected_metadata["dateadded"]
+    cached_metadata["dateadded"] = expected_metadata["dateadded"]
+    assert cached_ugc_video_list == expected_ugc_video_list
+
+
+@pytest.mark.utils
+def test_metadata_cache_expired(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(MetaDataCache, "enabled", True)
+    MetaDataCache.dump("test", "key", {"value": 1})
+    assert MetaDataCache.load("test", "key") == {"value": 1}
+
+    path = MetaDataCache.cache_dir / "test" / "key.json"
+    expired_time = time.time() - MetaDataCache.ttl - 60
+    os.utime(path, (expired_time, expired_time))
+    assert MetaDataCache.load("test", "key") is None
+
+
+@pytest.mark.utils
+def test_metadata_cache_disabled_or_refresh(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(MetaDataCache, "enabled", True)
+    MetaDataCache.dump("test", "key", {"value": 1})
+
+    monkeypatch.setattr(MetaDataCache, "refresh", True)
+    assert MetaDataCache.load("test", "key") is None
+
+    monkeypatch.setattr(MetaDataCache, "refresh", False)
+    monkeypatch.setattr(MetaDataCache, "enabled", False)
+    assert MetaDataCache.load("test", "key") is None
+    MetaDataCache.dump("test", "other_key", {"value": 2})
+    assert not (MetaDataCache.cache_dir / "test" / "other_key.json").exists()
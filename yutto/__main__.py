@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import copy
 import os
 import re
@@ -28,7 +29,7 @@ from yutto.extractor import (
     UserAllFavouritesExtractor,
     UserAllUgcVideosExtractor,
 )
-from yutto.processor.downloader import start_downloader
+from yutto.processor.downloader import MergeTask, merge_worker, start_downloader
 from yutto.processor.parser import alias_parser, file_scheme_parser
 from yutto.utils.console.logger import Badge, Logger
 from yutto.utils.fetcher import Fetcher
@@ -95,7 +96,7 @@ def cli() -> argparse.ArgumentParser:
         help="仅包含音频流时所使用的输出格式（infer 为自动推断）",
     )
     group_common.add_argument("-df", "--danmaku-format", default="ass", choices=["xml", "ass", "protobuf"], help="弹幕类型")
-    group_common.add_argument("-bs", "--block-size", default=0.5, type=float, help="分块下载时各块大小，单位为 MiB，默认为 0.5MiB")
+    group_common.add_argument("-bs", "--block-size", default=0.5, type=float, help="分块下载时各块的初始大小，单位为 MiB，默认为 0.5MiB")
     group_common.add_argument("-w", "--overwrite", action="store_true", help="强制覆盖已下载内容")
     group_common.add_argument("-x", "--proxy", default="auto", help="设置代理（auto 为系统代理、no 为不使用代理、当然也可以设置代理值）")
     group_common.add_argument("-d", "--dir", default="./", help="下载目录，默认为运行目录")
@@ -161,6 +162,8 @@ def cli() -> argparse.ArgumentParser:
     group_common.add_argument("--metadata-format", default="nfo", choices=["nfo"], help="（待实现）元数据文件类型，目前仅支持 nfo")
     group_common.add_argument("--embed-danmaku", action="store_true", help="（待实现）将弹幕文件嵌入到视频中")
     group_common.add_argument("--embed-subtitle", default=None, help="（待实现）将字幕文件嵌入到视频中（需输入语言代码）")
+    group_common.add_argument("--no-metadata-cache", action="store_true", help="不使用本地视频信息缓存")
+    group_common.add_argument("--refresh-metadata", action="store_true", help="忽略已有的本地视频信息缓存，重新获取并更新缓存")
     group_common.add_argument("--no-color", action="store_true", help="不使用颜色")
     group_common.add_argument("--no-progress", action="store_true", help="不显示进度条")
     group_common.add_argument("--debug", action="store_true", help="启用 debug 模式")
@@ -180,6 +183,9 @@ def cli() -> argparse.ArgumentParser:
 
 @as_sync
 async def run(args_list: list[argparse.Namespace]):
+    # Python 3.9 中 Semaphore 会在创建时绑定到当前的事件循环，而模块导入时创建的信号量并不属于 asyncio.run 启动的循环，
+    # 并发抓取信息时一旦有任务需要等待便会报错，因此需要在事件循环中重新创建
+    Fetcher.set_semaphore(8)
     async with aiohttp.ClientSession(
         headers=Fetcher.headers,
         cookies=Fetcher.cookies,
@@ -206,7 +212,7 @@ async def run(args_list: list[argparse.Namespace]):
                     UserAllFavouritesExtractor(),  # 用户全部收藏
                     SeriesExtractor(),  # 视频列表
                     CollectionExtractor(),  # 视频合集
-                    UserAllUgcVideosExtractor(),  # 个人空间，由于个人空间的正则包含了收藏夹，所以需要放在收藏夹之后
+                    UserAllUgcVideosExtractor(),  # 个人空间
                 ]
                 if args.batch
                 else [
@@ -243,38 +249,70 @@ async def run(args_list: list[argparse.Namespace]):
                 sys.exit(ErrorCode.WRONG_URL_ERROR.value)
 
             # 下载～
-            for i, episode_data_coro in enumerate(download_list):
-                if episode_data_coro is None:
-                    continue
-                # 这时候才真正开始解析链接
-                episode_data = await episode_data_coro
-                if episode_data is None:
-                    continue
-                if args.batch:
-                    Logger.custom(
-                        f"{episode_data['filename']}",
-                        Badge(f"[{i+1}/{len(download_list)}]", fore="black", back="cyan"),
-                    )
-                await start_downloader(
-                    session,
-                    episode_data,
-                    {
-                        "require_video": args.require_video,
-                        "video_quality": args.video_quality,
-                        "video_download_codec": args.vcodec.split(":")[0],
-                        "video_save_codec": args.vcodec.split(":")[1],
-                        "require_audio": args.require_audio,
-                        "audio_quality": args.audio_quality,
-                        "audio_download_codec": args.acodec.split(":")[0],
-                        "audio_save_codec": args.acodec.split(":")[1],
-                        "output_format": args.output_format,
-                        "output_format_audio_only": args.output_format_audio_only,
-                        "overwrite": args.overwrite,
-                        "block_size": int(args.block_size * 1024 * 1024),
-                        "num_workers": args.num_workers,
-                    },
-                )
-                Logger.new_line()
+            # 下载与合并以流水线方式进行，当前视频合并的同时下一个视频可以开始下载
+            merge_queue: asyncio.Queue[MergeTask | None] = asyncio.Queue(maxsize=2)
+
+            async def download_all():
+                episode_data_coros = [(i, coro) for i, coro in enumerate(download_list) if coro is not None]
+                if not episode_data_coros:
+                    return
+                # 这时候才真正开始解析链接，并且在处理当前视频的同时预先解析下一个视频的链接
+                episode_data_task = asyncio.create_task(episode_data_coros[0][1])
+                try:
+                    for k, (i, _) in enumerate(episode_data_coros):
+                        episode_data = await episode_data_task
+                        if k + 1 < len(episode_data_coros):
+                            episode_data_task = asyncio.create_task(episode_data_coros[k + 1][1])
+                        if episode_data is None:
+                            continue
+                        if args.batch:
+                            Logger.custom(
+                                f"{episode_data['filename']}",
+                                Badge(f"[{i+1}/{len(download_list)}]", fore="black", back="cyan"),
+                            )
+                        await start_downloader(
+                            session,
+                            episode_data,
+                            {
+                                "require_video": args.require_video,
+                                "video_quality": args.video_quality,
+                                "video_download_codec": args.vcodec.split(":")[0],
+                                "video_save_codec": args.vcodec.split(":")[1],
+                                "require_audio": args.require_audio,
+                                "audio_quality": args.audio_quality,
+                                "audio_download_codec": args.acodec.split(":")[0],
+                                "audio_save_codec": args.acodec.split(":")[1],
+                                "output_format": args.output_format,
+                                "output_format_audio_only": args.output_format_audio_only,
+                                "overwrite": args.overwrite,
+                                "block_size": int(args.block_size * 1024 * 1024),
+                                "num_workers": args.num_workers,
+                            },
+                            merge_queue,
+                        )
+                        Logger.new_line()
+                finally:
+                    # 下载出错或被取消时，预先解析的下一个视频已经不再需要，
+                    # 将其取消并回收，避免其继续在后台运行，或者其异常无人处理
+                    episode_data_task.cancel()
+                    await asyncio.gather(episode_data_task, return_exceptions=True)
+
+            downloader = asyncio.create_task(download_all())
+            merger = asyncio.create_task(merge_worker(merge_queue))
+
+            def stop_downloader_if_merge_failed(task: asyncio.Task[None]):
+                # 合并失败时不必继续下载，同时避免下载任务阻塞在已满的队列上
+                if not task.cancelled() and task.exception() is not None:
+                    downloader.cancel()
+
+            merger.add_done_callback(stop_downloader_if_merge_failed)
+            try:
+                await downloader
+            finally:
+                # 即便下载出错，也要先将队列中已下载完成的视频合并完再抛出异常
+                if not merger.done():
+                    await merge_queue.put(None)
+                await merger
             Logger.new_line()
 
 
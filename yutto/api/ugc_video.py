@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import re
-from typing import TypedDict
+from typing import Any, TypedDict
 
 from aiohttp import ClientSession
 
@@ -25,10 +27,14 @@ from yutto.exceptions import (
 from yutto.utils.console.logger import Logger
 from yutto.utils.fetcher import Fetcher
 from yutto.utils.metadata import MetaData
+from yutto.utils.metadata_cache import MetaDataCache
 from yutto.utils.time import get_time_str_by_now, get_time_str_by_stamp
 
+_REGEX_EP = re.compile(r"https?://www\.bilibili\.com/bangumi/play/ep(?P<episode_id>\d+)")
+
 
 class _UgcVideoPageInfo(TypedDict):
+    cid: CId
     part: str
     first_frame: str | None
 
@@ -63,7 +69,6 @@ class UgcVideoList(TypedDict):
 
 
 async def get_ugc_video_info(session: ClientSession, avid: AvId) -> _UgcVideoInfo:
-    regex_ep = re.compile(r"https?://www\.bilibili\.com/bangumi/play/ep(?P<episode_id>\d+)")
     info_api = "http://api.bilibili.com/x/web-interface/view?aid={aid}&bvid={bvid}"
     res_json = await Fetcher.fetch_json(session, info_api.format(**avid.to_dict()))
     if res_json is None:
@@ -79,7 +84,7 @@ async def get_ugc_video_info(session: ClientSession, avid: AvId) -> _UgcVideoInf
         Logger.info(f"视频 {avid} 撞车了哦！正在跳转到原视频 {forward_avid}～")
         return await get_ugc_video_info(session, forward_avid)
     episode_id = EpisodeId("")
-    if res_json_data.get("redirect_url") and (ep_match := regex_ep.match(res_json_data["redirect_url"])):
+    if res_json_data.get("redirect_url") and (ep_match := _REGEX_EP.match(res_json_data["redirect_url"])):
         episode_id = EpisodeId(ep_match.group("episode_id"))
     return {
         "avid": BvId(res_json_data["bvid"]),
@@ -94,6 +99,7 @@ async def get_ugc_video_info(session: ClientSession, avid: AvId) -> _UgcVideoInf
         "description": res_json_data["desc"],
         "pages": [
             {
+                "cid": CId(str(page["cid"])),
                 "part": page["part"],
                 "first_frame": page.get("first_frame"),
             }
@@ -102,7 +108,38 @@ async def get_ugc_video_info(session: ClientSession, avid: AvId) -> _UgcVideoInf
     }
 
 
+# 同一会话中相同 avid 的请求会合并到同一个 Task 上，避免不同提取器重复请求
+_ugc_video_list_tasks: dict[str, asyncio.Task[UgcVideoList]] = {}
+
+
 async def get_ugc_video_list(session: ClientSession, avid: AvId) -> UgcVideoList:
+    key = str(avid)
+    task = _ugc_video_list_tasks.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.create_task(_get_ugc_video_list_with_cache(session, avid))
+        _ugc_video_list_tasks[key] = task
+    try:
+        ugc_video_list = await asyncio.shield(task)
+    except Exception:
+        # 失败的结果不缓存，以便后续重新请求
+        if _ugc_video_list_tasks.get(key) is task:
+            del _ugc_video_list_tasks[key]
+        raise
+    # 调用方可能会修改返回值（如筛选 pages），因此返回副本
+    return copy.deepcopy(ugc_video_list)
+
+
+async def _get_ugc_video_list_with_cache(session: ClientSession, avid: AvId) -> UgcVideoList:
+    cache_key = str(avid)
+    if (cached := MetaDataCache.load("ugc_list", cache_key)) is not None:
+        return _load_ugc_video_list(cached)
+    ugc_video_list = await _fetch_ugc_video_list(session, avid)
+    if ugc_video_list["pages"]:
+        MetaDataCache.dump("ugc_list", cache_key, _dump_ugc_video_list(ugc_video_list))
+    return ugc_video_list
+
+
+async def _fetch_ugc_video_list(session: ClientSession, avid: AvId) -> UgcVideoList:
     video_info = await get_ugc_video_info(session, avid)
     if avid not in [video_info["aid"], video_info["bvid"]]:
         avid = video_info["avid"]
@@ -113,29 +150,25 @@ async def get_ugc_video_list(session: ClientSession, avid: AvId) -> UgcVideoList
         "pubdate": get_time_str_by_stamp(video_info["pubdate"], "%Y-%m-%d"),  # TODO: 可自由定制
         "pages": [],
     }
-    list_api = "https://api.bilibili.com/x/player/pagelist?aid={aid}&bvid={bvid}&jsonp=jsonp"
-    res_json = await Fetcher.fetch_json(session, list_api.format(**avid.to_dict()))
-    if res_json is None or res_json.get("data") is None:
+    # 视频信息接口中已经包含了完整的分 P 列表，无需再额外请求 pagelist 接口
+    if not video_info["pages"]:
         Logger.warning(f"啊叻？视频 {avid} 不见了诶")
         return result
 
     # 对无意义的分 p 视频名进行修改
-    for i, (item, page_info) in enumerate(zip(res_json["data"], video_info["pages"])):
-        # TODO: 这里 part 出现了两次，需要都修改，后续去除其中一个冗余数据
-        if _is_meaningless_name(item["part"]):
-            item["part"] = f"{video_title}_P{i+1:02}"
+    for i, page_info in enumerate(video_info["pages"]):
         if _is_meaningless_name(page_info["part"]):
             page_info["part"] = f"{video_title}_P{i+1:02}"
 
     result["pages"] = [
         {
             "id": i + 1,
-            "name": item["part"],
+            "name": page_info["part"],
             "avid": avid,
-            "cid": CId(str(item["cid"])),
+            "cid": page_info["cid"],
             "metadata": _parse_ugc_video_metadata(video_info, page_info),
         }
-        for i, (item, page_info) in enumerate(zip(res_json["data"], video_info["pages"]))
+        for i, page_info in enumerate(video_info["pages"])
     ]
     return result
 
@@ -254,6 +287,47 @@ def _parse_ugc_video_metadata(video_info: _UgcVideoInfo, page_info: _UgcVideoPag
     )
 
 
+def _parse_avid(value: str) -> AvId:
+    return BvId(value) if value.startswith("BV") else AId(value)
+
+
+def _dump_ugc_video_list(ugc_video_list: UgcVideoList) -> dict[str, Any]:
+    return {
+        "title": ugc_video_list["title"],
+        "pubdate": ugc_video_list["pubdate"],
+        "avid": str(ugc_video_list["avid"]),
+        "pages": [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "avid": str(item["avid"]),
+                "cid": str(item["cid"]),
+                "metadata": item["metadata"],
+            }
+            for item in ugc_video_list["pages"]
+        ],
+    }
+
+
+def _load_ugc_video_list(data: dict[str, Any]) -> UgcVideoList:
+    return {
+        "title": data["title"],
+        "pubdate": data["pubdate"],
+        "avid": _parse_avid(data["avid"]),
+        "pages": [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "avid": _parse_avid(item["avid"]),
+                "cid": CId(item["cid"]),
+                # 添加日期应为本次下载的日期，而不是缓存时的日期
+                "metadata": MetaData(**{**item["metadata"], "dateadded": get_time_str_by_now()}),
+            }
+            for item in data["pages"]
+        ],
+    }
+
+
 def _is_meaningless_name(name: str) -> bool:
     """检测名称是否为无意义的名称"""
     # name 为空
@@ -98,6 +98,10 @@ audio_quality_map = {
     },
 }
 
+# 预先展开 description，避免显示时两级查找
+video_quality_description_map: dict[int, str] = {k: v["description"] for k, v in video_quality_map.items()}
+audio_quality_description_map: dict[int, str] = {k: v["description"] for k, v in audio_quality_map.items()}
+
 
 def gen_video_quality_priority(quality: VideoQuality) -> list[VideoQuality]:
     choice = video_quality_priority_default.index(quality)
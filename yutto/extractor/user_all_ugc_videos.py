@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import re
 from collections.abc import Coroutine
 from typing import Any
 
 import aiohttp
 
-from yutto._typing import EpisodeData, MId
+from yutto._typing import AvId, EpisodeData, MId
 from yutto.api.space import get_user_name, get_user_space_all_videos_avids
-from yutto.api.ugc_video import UgcVideoListItem, get_ugc_video_list
+from yutto.api.ugc_video import UgcVideoList, UgcVideoListItem, get_ugc_video_list
 from yutto.exceptions import NotFoundError
 from yutto.extractor._abc import BatchExtractor
 from yutto.extractor.common import extract_ugc_video_data
@@ -20,12 +21,12 @@ from yutto.utils.fetcher import Fetcher
 class UserAllUgcVideosExtractor(BatchExtractor):
     """UP 主个人空间全部投稿视频"""
 
-    REGEX_SPACE = re.compile(r"https?://space\.bilibili\.com/(?P<mid>\d+)(/video)?")
+    REGEX_SPACE = re.compile(r"https?://space\.bilibili\.com/(?P<mid>\d+)(?:/video)?/?(?:[?#].*)?")
 
     mid: MId
 
     def match(self, url: str) -> bool:
-        if match_obj := self.REGEX_SPACE.match(url):
+        if match_obj := self.REGEX_SPACE.fullmatch(url):
             self.mid = MId(match_obj.group("mid"))
             return True
         else:
@@ -37,22 +38,32 @@ class UserAllUgcVideosExtractor(BatchExtractor):
         username = await get_user_name(session, self.mid)
         Logger.custom(username, Badge("UP 主投稿视频", fore="black", back="cyan"))
 
-        ugc_video_info_list: list[tuple[UgcVideoListItem, str, str]] = []
-        for avid in await get_user_space_all_videos_avids(session, self.mid):
+        async def fetch_ugc_video_list(avid: AvId) -> UgcVideoList | None:
             try:
                 ugc_video_list = await get_ugc_video_list(session, avid)
                 await Fetcher.touch_url(session, avid.to_url())
-                for ugc_video_item in ugc_video_list["pages"]:
-                    ugc_video_info_list.append(
-                        (
-                            ugc_video_item,
-                            ugc_video_list["title"],
-                            ugc_video_list["pubdate"],
-                        )
-                    )
+                return ugc_video_list
             except NotFoundError as e:
                 Logger.error(e.message)
+                return None
+
+        # 各视频信息之间互不依赖，因此并发获取，并发数由 Fetcher 的信号量控制
+        ugc_video_lists = await asyncio.gather(
+            *[fetch_ugc_video_list(avid) for avid in await get_user_space_all_videos_avids(session, self.mid)]
+        )
+
+        ugc_video_info_list: list[tuple[UgcVideoListItem, str, str]] = []
+        for ugc_video_list in ugc_video_lists:
+            if ugc_video_list is None:
                 continue
+            for ugc_video_item in ugc_video_list["pages"]:
+                ugc_video_info_list.append(
+                    (
+                        ugc_video_item,
+                        ugc_video_list["title"],
+                        ugc_video_list["pubdate"],
+                    )
+                )
 
         return [
             extract_ugc_video_data(
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-import functools
 import os
 from collections.abc import Coroutine
+from itertools import zip_longest
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import aiohttp
+from typing_extensions import TypeAlias
 
 from yutto._typing import AudioUrlMeta, DownloaderOptions, EpisodeData, VideoUrlMeta
-from yutto.bilibili_typing.quality import audio_quality_map, video_quality_map
+from yutto.bilibili_typing.quality import (
+    audio_quality_description_map,
+    video_quality_description_map,
+)
 from yutto.processor.progressbar import show_progress
 from yutto.processor.selector import select_audio, select_video
 from yutto.utils.console.colorful import colored_string
@@ -19,11 +23,25 @@ from yutto.utils.danmaku import write_danmaku
 from yutto.utils.fetcher import Fetcher
 from yutto.utils.ffmpeg import FFmpeg
 from yutto.utils.file_buffer import AsyncFileBuffer
-from yutto.utils.funcutils import filter_none_value, xmerge
+from yutto.utils.funcutils import filter_none_value
 from yutto.utils.metadata import write_metadata
 from yutto.utils.subtitle import write_subtitle
 
 
+def _get_usable_cpu_count() -> int:
+    # 容器或限制了 CPU 亲和性的环境中，os.cpu_count() 返回的是宿主机的核数，会导致 ffmpeg 线程过多
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # 非 Linux 平台没有 sched_getaffinity
+        return os.cpu_count() or 1
+
+
+USABLE_CPU_COUNT = _get_usable_cpu_count()
+
+# 已下载完成、等待合并的音视频，依次为 merge_video_and_audio 的参数
+MergeTask: TypeAlias = tuple[Optional[VideoUrlMeta], Path, Optional[AudioUrlMeta], Path, Path, DownloaderOptions]
+
+
 def slice_blocks(start: int, total_size: int | None, block_size: int | None = None) -> list[tuple[int, int | None]]:
     """生成分块后的 (start, size) 序列
 
@@ -43,14 +61,96 @@ def slice_blocks(start: int, total_size: int | None, block_size: int | None = No
         return [(0, total_size - 1)]
     assert start <= total_size, f"起始地址（{start}）大于总地址（{total_size}）"
     offset_list: list[tuple[int, int | None]] = [(i, block_size) for i in range(start, total_size, block_size)]
-    if (total_size - start) % block_size != 0:
-        offset_list[-1] = (
-            start + (total_size - start) // block_size * block_size,
-            total_size - start - (total_size - start) // block_size * block_size,
-        )
+    # 最后一块的起始位置不变，只需要修正其大小
+    if remainder := (total_size - start) % block_size:
+        offset_list[-1] = (offset_list[-1][0], remainder)
     return offset_list
 
 
+class AdaptiveBlockSlicer:
+    """根据实时下载速度动态调整分块大小的分块器
+
+    初始时使用较小的块以尽快开始下载，之后根据已完成各块的下载速度（指数滑动平均）逐渐调整块的大小，
+    使每块的下载耗时大致为 target_time，从而在高速下载时减少请求次数，在低速下载时避免单块拖尾
+
+    ### Args
+
+    - start (int): 总起始位置
+    - total_size (int): 需要分块的总大小
+    - min_block_size (int): 最小块大小，同时也是初始块大小
+    - max_block_size (int): 最大块大小
+    - target_time (float): 每块期望的下载耗时（秒）
+    - smoothing (float): 滑动平均中新速度所占的权重
+    """
+
+    def __init__(
+        self,
+        start: int,
+        total_size: int,
+        min_block_size: int,
+        max_block_size: int,
+        target_time: float = 0.25,
+        smoothing: float = 0.3,
+    ):
+        assert start <= total_size, f"起始地址（{start}）大于总地址（{total_size}）"
+        self.offset = start
+        self.total_size = total_size
+        self.min_block_size = min_block_size
+        self.max_block_size = max(max_block_size, min_block_size)
+        self.target_time = target_time
+        self.smoothing = smoothing
+        self.block_size = min_block_size
+        self.speed: float | None = None
+
+    def next_block(self) -> tuple[int, int] | None:
+        """获取下一个块的 (start, size)，已分完时返回 None"""
+        if self.offset >= self.total_size:
+            return None
+        size = min(self.block_size, self.total_size - self.offset)
+        block = (self.offset, size)
+        self.offset += size
+        return block
+
+    def feedback(self, size: int, elapsed: float):
+        """根据已完成块的大小和耗时更新下载速度与后续块的大小"""
+        speed = size / (elapsed + 10**-6)
+        self.speed = speed if self.speed is None else self.smoothing * speed + (1 - self.smoothing) * self.speed
+        self.block_size = int(min(max(self.speed * self.target_time, self.min_block_size), self.max_block_size))
+
+
+async def download_blocks(
+    session: aiohttp.ClientSession,
+    url: str,
+    mirrors: list[str],
+    file_buffer: AsyncFileBuffer,
+    slicer: AdaptiveBlockSlicer,
+):
+    """不断从分块器中取块下载，并将各块耗时反馈给分块器，直到分块器中没有剩余的块"""
+    while (block := slicer.next_block()) is not None:
+        offset, size = block
+        # 反馈给分块器的耗时仅包含传输时间，而不包含等待信号量的时间
+        _, elapsed = await Fetcher.download_file_with_offset(session, url, mirrors, file_buffer, offset, size)
+        slicer.feedback(size, elapsed)
+
+
+async def download_first_block(
+    session: aiohttp.ClientSession,
+    stream: VideoUrlMeta | AudioUrlMeta | None,
+    file_buffer: AsyncFileBuffer | None,
+    block_size: int,
+) -> int | None:
+    """下载音视频流的首个块，并从其响应中得到流的总大小，以省去单独获取大小的请求
+
+    流不存在或服务器不支持分段下载时返回 None，后者的情况下首个块即为完整的流
+    """
+    if stream is None or file_buffer is None:
+        return None
+    total_size, _ = await Fetcher.download_file_with_offset(
+        session, stream["url"], stream["mirrors"], file_buffer, file_buffer.written_size, block_size
+    )
+    return total_size
+
+
 def show_videos_info(videos: list[VideoUrlMeta], selected: int):
     """显示视频详细信息"""
     if not videos:
@@ -58,15 +158,11 @@ def show_videos_info(videos: list[VideoUrlMeta], selected: int):
         return
     Logger.info(f"共包含以下 {len(videos)} 个视频流：")
     for i, video in enumerate(videos):
-        log = "{}{:2} [{:^4}] [{:>4}x{:<4}] <{:^8}> #{}".format(
-            "*" if i == selected else " ",
-            i,
-            video["codec"].upper(),
-            video["width"],
-            video["height"],
-            video_quality_map[video["quality"]]["description"],
-            len(video["mirrors"]) + 1,
-        )
+        mark = "*" if i == selected else " "
+        codec = video["codec"].upper()
+        description = video_quality_description_map[video["quality"]]
+        num_urls = len(video["mirrors"]) + 1
+        log = f"{mark}{i:2} [{codec:^4}] [{video['width']:>4}x{video['height']:<4}] <{description:^8}> #{num_urls}"
         if i == selected:
             log = colored_string(log, fore="blue")
         Logger.info(log)
@@ -79,9 +175,10 @@ def show_audios_info(audios: list[AudioUrlMeta], selected: int):
         return
     Logger.info(f"共包含以下 {len(audios)} 个音频流：")
     for i, audio in enumerate(audios):
-        log = "{}{:2} [{:^4}] <{:^8}>".format(
-            "*" if i == selected else " ", i, audio["codec"].upper(), audio_quality_map[audio["quality"]]["description"]
-        )
+        mark = "*" if i == selected else " "
+        codec = audio["codec"].upper()
+        description = audio_quality_description_map[audio["quality"]]
+        log = f"{mark}{i:2} [{codec:^4}] <{description:^8}>"
         if i == selected:
             log = colored_string(log, fore="magenta")
         Logger.info(log)
@@ -101,30 +198,41 @@ async def download_video_and_audio(
     sizes: list[int | None] = [None, None]
     coroutines_list: list[list[Coroutine[Any, Any, None]]] = []
     Fetcher.set_semaphore(options["num_workers"])
-    if video is not None:
-        vbuf = await AsyncFileBuffer(video_path, overwrite=options["overwrite"])
-        vsize = await Fetcher.get_size(session, video["url"])
-        video_coroutines = [
-            Fetcher.download_file_with_offset(session, video["url"], video["mirrors"], vbuf, offset, block_size)
-            for offset, block_size in slice_blocks(vbuf.written_size, vsize, options["block_size"])
-        ]
+    # 块大小从 block_size 开始，随下载速度自适应增长，最多增长到 16 倍
+    max_block_size = options["block_size"] * 16
+    vbuf = await AsyncFileBuffer(video_path, overwrite=options["overwrite"]) if video is not None else None
+    abuf = await AsyncFileBuffer(audio_path, overwrite=options["overwrite"]) if audio is not None else None
+    Logger.info("开始下载……")
+    # 首个块的响应头中已经包含了流的总大小，因此先同时下载音视频流的首个块，剩余部分再分块下载
+    vsize, asize = await asyncio.gather(
+        download_first_block(session, video, vbuf, options["block_size"]),
+        download_first_block(session, audio, abuf, options["block_size"]),
+    )
+    if video is not None and vbuf is not None:
+        video_coroutines: list[Coroutine[Any, Any, None]] = []
+        if vsize is not None:
+            vslicer = AdaptiveBlockSlicer(vbuf.written_size, vsize, options["block_size"], max_block_size)
+            video_coroutines = [
+                download_blocks(session, video["url"], video["mirrors"], vbuf, vslicer)
+                for _ in range(options["num_workers"])
+            ]
         coroutines_list.append(video_coroutines)
-        buffers[0], sizes[0] = vbuf, vsize
-
-    if audio is not None:
-        abuf = await AsyncFileBuffer(audio_path, overwrite=options["overwrite"])
-        asize = await Fetcher.get_size(session, audio["url"])
-        audio_coroutines = [
-            Fetcher.download_file_with_offset(session, audio["url"], audio["mirrors"], abuf, offset, block_size)
-            for offset, block_size in slice_blocks(abuf.written_size, asize, options["block_size"])
-        ]
+        buffers[0], sizes[0] = vbuf, vsize if vsize is not None else vbuf.written_size
+
+    if audio is not None and abuf is not None:
+        audio_coroutines: list[Coroutine[Any, Any, None]] = []
+        if asize is not None:
+            aslicer = AdaptiveBlockSlicer(abuf.written_size, asize, options["block_size"], max_block_size)
+            audio_coroutines = [
+                download_blocks(session, audio["url"], audio["mirrors"], abuf, aslicer)
+                for _ in range(options["num_workers"])
+            ]
         coroutines_list.append(audio_coroutines)
-        buffers[1], sizes[1] = abuf, asize
+        buffers[1], sizes[1] = abuf, asize if asize is not None else abuf.written_size
 
     # 为保证音频流和视频流尽可能并行，因此将两者混合一下～
-    coroutines = list(xmerge(*coroutines_list))
+    coroutines = [coro for coros in zip_longest(*coroutines_list) for coro in coros if coro is not None]
     coroutines.insert(0, show_progress(list(filter_none_value(buffers)), sum(filter_none_value(sizes))))
-    Logger.info("开始下载……")
     await asyncio.gather(*coroutines)
     Logger.info("下载完成！")
 
@@ -133,7 +241,7 @@ async def download_video_and_audio(
             await buffer.close()
 
 
-def merge_video_and_audio(
+async def merge_video_and_audio(
     video: VideoUrlMeta | None,
     video_path: Path,
     audio: AudioUrlMeta | None,
@@ -144,7 +252,7 @@ def merge_video_and_audio(
     """合并音视频"""
 
     ffmpeg = FFmpeg()
-    Logger.info("开始合并……")
+    Logger.info(f"开始合并 {output_path.name}……")
 
     # Using FFmpeg to Create HEVC Videos That Work on Apple Devices：
     # https://aaron.cc/ffmpeg-hevc-apple-devices/
@@ -168,12 +276,15 @@ def merge_video_and_audio(
         # see also: https://www.reddit.com/r/ffmpeg/comments/qe7oq1/comment/hi0bmic/?utm_source=share&utm_medium=web2x&context=3
         ["-strict", "unofficial"],
         ["-tag:v", vtag] if vtag is not None else [],
-        ["-threads", str(os.cpu_count())],
+        ["-threads", str(USABLE_CPU_COUNT)],
         ["-y", str(output_path)],
     ]
 
-    ffmpeg.exec(functools.reduce(lambda prev, cur: prev + cur, args_list))
-    Logger.info("合并完成！")
+    argv: list[str] = []
+    for args in args_list:
+        argv.extend(args)
+    await ffmpeg.aexec(argv)
+    Logger.info(f"{output_path.name} 合并完成！")
 
     if video is not None:
         video_path.unlink()
@@ -181,12 +292,25 @@ def merge_video_and_audio(
         audio_path.unlink()
 
 
+async def merge_worker(merge_queue: asyncio.Queue[MergeTask | None]):
+    """合并任务的消费者，依次合并队列中已下载完成的音视频，收到 None 时退出
+
+    配合 start_downloader 的 merge_queue 参数使用，使得前一个视频合并的同时下一个视频可以开始下载
+    """
+    while (merge_task := await merge_queue.get()) is not None:
+        await merge_video_and_audio(*merge_task)
+
+
 async def start_downloader(
     session: aiohttp.ClientSession,
     episode_data: EpisodeData,
     options: DownloaderOptions,
+    merge_queue: asyncio.Queue[MergeTask | None] | None = None,
 ):
-    """处理单个视频下载任务，包含弹幕、字幕的存储"""
+    """处理单个视频下载任务，包含弹幕、字幕的存储
+
+    如果传入了 merge_queue，则下载完成后将合并任务放入队列交由 merge_worker 处理，否则直接合并
+    """
 
     videos = episode_data["videos"]
     audios = episode_data["audios"]
@@ -204,18 +328,14 @@ async def start_downloader(
     video_path = tmp_dir.joinpath(filename + "_video.m4s")
     audio_path = tmp_dir.joinpath(filename + "_audio.m4s")
 
-    video = select_video(videos, options["video_quality"], options["video_download_codec"])
-    audio = select_audio(audios, options["audio_quality"], options["audio_download_codec"])
+    video_index, video = select_video(videos, options["video_quality"], options["video_download_codec"])
+    audio_index, audio = select_audio(audios, options["audio_quality"], options["audio_download_codec"])
     will_download_video = video is not None and require_video
     will_download_audio = audio is not None and require_audio
 
     # 显示音视频详细信息
-    show_videos_info(
-        videos, videos.index(video) if will_download_video else -1  # pyright: ignore [reportGeneralTypeIssues]
-    )
-    show_audios_info(
-        audios, audios.index(audio) if will_download_audio else -1  # pyright: ignore [reportGeneralTypeIssues]
-    )
+    show_videos_info(videos, video_index if will_download_video else -1)
+    show_audios_info(audios, audio_index if will_download_audio else -1)
 
     output_dir.mkdir(parents=True, exist_ok=True)
     output_format = ".mp4"
@@ -277,4 +397,8 @@ async def start_downloader(
     await download_video_and_audio(session, video, video_path, audio, audio_path, options)
 
     # 合并视频 / 音频
-    merge_video_and_audio(video, video_path, audio, audio_path, output_path, options)
+    if merge_queue is not None:
+        await merge_queue.put((video, video_path, audio, audio_path, output_path, options))
+    else:
+        # 仅 ffmpeg 子进程在线程中执行（见 FFmpeg.aexec），日志输出与临时文件清理仍在事件循环中进行
+        await merge_video_and_audio(video, video_path, audio, audio_path, output_path, options)
@@ -53,9 +53,8 @@ async def show_progress(file_buffers: list[AsyncFileBuffer], total_size: int):
     progress_bar = ProgressBar("╸━", "━")
     bar_min_width, bar_max_width = 10, 50
     while True:
-        size_in_buffer: int = sum(
-            [sum([len(chunk.data) for chunk in file_buffer.buffer]) for file_buffer in file_buffers]
-        )
+        # 只读取各 buffer 维护的计数，避免每次刷新都遍历所有块
+        size_in_buffer: int = sum([file_buffer.size_in_buffer for file_buffer in file_buffers])
         num_blocks_in_buffer: int = sum([len(file_buffer.buffer) for file_buffer in file_buffers])
         size_written: int = sum([file_buffer.written_size for file_buffer in file_buffers])
 
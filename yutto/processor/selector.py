@@ -24,7 +24,8 @@ def select_video(
     videos: list[VideoUrlMeta],
     video_quality: VideoQuality = 127,
     video_codec: VideoCodec = "hevc",
-) -> VideoUrlMeta | None:
+) -> tuple[int, VideoUrlMeta | None]:
+    """按照清晰度与编码优先级选择视频流，返回 (所选视频流在 videos 中的索引, 所选视频流)，无可选视频流时返回 (-1, None)"""
     video_quality_priority = gen_video_quality_priority(video_quality)
     video_codec_priority = gen_vcodec_priority(video_codec)
 
@@ -38,17 +39,18 @@ def select_video(
     # fmt: on
 
     for vqn, vcodec in video_combined_priority:
-        for video in videos:
+        for i, video in enumerate(videos):
             if video["quality"] == vqn and video["codec"] == vcodec:
-                return video
-    return None
+                return i, video
+    return -1, None
 
 
 def select_audio(
     audios: list[AudioUrlMeta],
     audio_quality: AudioQuality = 30280,
     audio_codec: AudioCodec = "mp4a",
-) -> AudioUrlMeta | None:
+) -> tuple[int, AudioUrlMeta | None]:
+    """按照码率与编码优先级选择音频流，返回 (所选音频流在 audios 中的索引, 所选音频流)，无可选音频流时返回 (-1, None)"""
     audio_quality_priority = gen_audio_quality_priority(audio_quality)
     audio_codec_priority = gen_acodec_priority(audio_codec)
 
@@ -61,10 +63,10 @@ def select_audio(
     # fmt: on
 
     for aqn, acodec in audio_combined_priority:
-        for audio in audios:
+        for i, audio in enumerate(audios):
             if audio["quality"] == aqn and audio["codec"] == acodec:
-                return audio
-    return None
+                return i, audio
+    return -1, None
 
 
 def validate_episodes_selection(episodes_str: str) -> bool:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import random
+import time
 from collections.abc import Coroutine
 from typing import Any, Callable, Literal, TypeVar
 from urllib.parse import quote, unquote
@@ -16,6 +17,14 @@ from yutto.utils.file_buffer import AsyncFileBuffer
 T = TypeVar("T")
 
 
+def _parse_total_size(resp: aiohttp.ClientResponse) -> int | None:
+    """从分段请求响应的 Content-Range（如 bytes 0-1023/4096 或 bytes */4096）中解析文件总大小"""
+    if resp.status not in (206, 416):
+        return None
+    total = resp.headers.get("Content-Range", "").split("/")[-1]
+    return int(total) if total.isdigit() else None
+
+
 class MaxRetry:
     """重试装饰器，为请求方法提供一定的重试次数
 
@@ -177,10 +186,17 @@ class Fetcher:
         offset: int,
         size: int | None,
         stream: bool = True,
-    ) -> None:
+    ) -> tuple[int | None, float]:
+        """下载文件中从 offset 开始大小为 size 的部分
+
+        返回从响应中得到的文件总大小（服务器不支持分段下载时为 None）以及实际传输所用的时间（秒），
+        后者从获取到信号量后开始计时，不包含排队等待的时间
+        """
         async with cls.semaphore:
+            start_time = time.time()
             Logger.debug(f"Start download (offset {offset}) {url}")
             done = False
+            total_size: int | None = None
             headers = session.headers.copy()
             url_pool = [url] + mirrors
             block_offset = 0
@@ -197,15 +213,16 @@ class Fetcher:
                         proxy=Fetcher.proxy,
                         ssl=False,
                     ) as resp:
-                        if stream:
-                            while True:
-                                # 如果直接用 1KiB 的话，会产生大量的块，需要消耗大量的 CPU 资源来维持顺序，
-                                # 而使用 1MiB 以上或者不使用流式下载方式时，由于分块太大，
-                                # 导致进度条显示的实时速度并不准，波动太大，用户体验不佳，
-                                # 因此取两者折中
-                                chunk = await resp.content.read(2**16)
-                                if not chunk:
-                                    break
+                        total_size = _parse_total_size(resp)
+                        if resp.status == 416:
+                            # 请求的起始位置已达到文件末尾，说明该部分已经下载完毕
+                            pass
+                        elif stream:
+                            # 如果直接用 1KiB 的话，会产生大量的块，需要消耗大量的 CPU 资源来维持顺序，
+                            # 而使用 1MiB 以上或者不使用流式下载方式时，由于分块太大，
+                            # 导致进度条显示的实时速度并不准，波动太大，用户体验不佳，
+                            # 因此取两者折中，写入文件时再由 file_buffer 合并为更大的块
+                            async for chunk in resp.content.iter_chunked(2**16):
                                 await file_buffer.write(chunk, offset + block_offset)
                                 block_offset += len(chunk)
                         else:
@@ -222,3 +239,4 @@ class Fetcher:
 
                 except asyncio.TimeoutError:
                     Logger.warning(f"文件 {file_buffer.file_path} 下载超时，尝试重新连接...")
+            return total_size, time.time() - start_time
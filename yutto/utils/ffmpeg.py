@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import subprocess
@@ -30,6 +31,13 @@ class FFmpeg(metaclass=Singleton):
         Logger.debug(" ".join(cmd))
         return subprocess.run(cmd, capture_output=True)
 
+    async def aexec(self, args: list[str]):
+        """在线程中执行 ffmpeg，避免阻塞事件循环，仅子进程的执行在线程中，日志仍在调用方线程输出"""
+        cmd = [self.path]
+        cmd.extend(args)
+        Logger.debug(" ".join(cmd))
+        return await asyncio.to_thread(subprocess.run, cmd, capture_output=True)
+
     @cached_property
     def version(self) -> str:
         output = self.exec(["-version"]).stdout.decode()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import heapq
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -42,32 +43,58 @@ class AsyncFileBuffer(aobject):
     ```
     """
 
+    # 已按顺序就绪的数据累积到该大小后才真正写入文件，以减少小块写入的开销
+    flush_size: int = 1024 * 1024
+
     # pyright: reportIncompatibleMethodOverride=false
     async def __ainit__(self, file_path: str | Path, overwrite: bool = False):
         self.file_path = Path(file_path)
         if overwrite:
             self.file_path.unlink(missing_ok=True)
         self.buffer = list[BufferChunk]()
+        # 堆中尚未就绪的数据大小，随入堆出堆同步更新，以便进度条无需每次遍历整个堆
+        self.size_in_buffer = 0
+        # written_size 包含已写入文件以及已按顺序就绪但尚未写入文件的数据大小
         self.written_size = self.file_path.stat().st_size if not overwrite and self.file_path.exists() else 0
+        self.pending = list[bytes]()
+        self.pending_size = 0
+        self.write_lock = asyncio.Lock()
         self.file_obj: aiofiles.threadpool.binary.AsyncBufferedIOBase | None = await aiofiles.open(file_path, "ab")
 
     async def write(self, chunk: bytes, offset: int):
         buffer_chunk = BufferChunk(offset, chunk)
         # 使用堆结构，保证第一个元素始终最小
         heapq.heappush(self.buffer, buffer_chunk)
+        self.size_in_buffer += len(chunk)
         while self.buffer and self.buffer[0].offset <= self.written_size:
-            assert self.file_obj is not None
             ready_to_write_chunk = heapq.heappop(self.buffer)
+            self.size_in_buffer -= len(ready_to_write_chunk.data)
             if ready_to_write_chunk.offset < self.written_size:
                 Logger.error(f"交叠的块范围 {ready_to_write_chunk.offset} < {self.written_size}，舍弃！")
                 continue
-            await self.file_obj.write(ready_to_write_chunk.data)
+            self.pending.append(ready_to_write_chunk.data)
+            self.pending_size += len(ready_to_write_chunk.data)
             self.written_size += len(ready_to_write_chunk.data)
+        if self.pending_size >= self.flush_size:
+            await self.flush()
+
+    async def flush(self):
+        # 加锁以保证多次写入按顺序完成
+        async with self.write_lock:
+            if not self.pending:
+                return
+            assert self.file_obj is not None
+            # 将所有已连续的块合并为一次写入，减少线程池调度及系统调用的次数
+            data = b"".join(self.pending)
+            self.pending.clear()
+            self.pending_size = 0
+            await self.file_obj.write(data)
 
     async def close(self):
         if self.buffer:
             Logger.error("buffer 尚未清空")
         if self.file_obj is not None:
+            await self.flush()
             await self.file_obj.close()
         else:
             Logger.error("未预期的结果：未曾创建文件对象")
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from yutto.utils.console.logger import Logger
+
+
+def _default_cache_dir() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base_dir = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+    return base_dir / "yutto"
+
+
+class MetaDataCache:
+    """基于本地 JSON 文件的元数据缓存，按 mtime 判断是否过期
+
+    ### Examples
+
+    ``` python
+    data = MetaDataCache.load("ugc_list", "BV1vZ4y1M7mQ")
+    if data is None:
+        data = await fetch_something()
+        MetaDataCache.dump("ugc_list", "BV1vZ4y1M7mQ", data)
+    ```
+    """
+
+    enabled: bool = True
+    refresh: bool = False
+    ttl: float = 24 * 60 * 60
+    cache_dir: Path = _default_cache_dir()
+
+    @classmethod
+    def set_cache(cls, enabled: bool, refresh: bool):
+        MetaDataCache.enabled = enabled
+        MetaDataCache.refresh = refresh
+
+    @classmethod
+    def _get_path(cls, namespace: str, key: str) -> Path:
+        return cls.cache_dir / namespace / f"{key}.json"
+
+    @classmethod
+    def load(cls, namespace: str, key: str) -> Any | None:
+        if not cls.enabled or cls.refresh:
+            return None
+        path = cls._get_path(namespace, key)
+        try:
+            if time.time() - path.stat().st_mtime > cls.ttl:
+                return None
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        Logger.debug(f"Hit metadata cache: {path}")
+        return data
+
+    @classmethod
+    def dump(cls, namespace: str, key: str, data: Any):
+        if not cls.enabled:
+            return
+        path = cls._get_path(namespace, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            Logger.debug(f"Failed to write metadata cache {path}: {e}")
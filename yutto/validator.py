@@ -20,6 +20,7 @@ from yutto.utils.console.colorful import set_no_color
 from yutto.utils.console.logger import Badge, Logger, set_logger_debug
 from yutto.utils.fetcher import Fetcher
 from yutto.utils.ffmpeg import FFmpeg
+from yutto.utils.metadata_cache import MetaDataCache
 
 
 def initial_validate(args: argparse.Namespace):
@@ -46,6 +47,9 @@ def initial_validate(args: argparse.Namespace):
         sys.exit(ErrorCode.WRONG_ARGUMENT_ERROR.value)
     Fetcher.set_proxy(args.proxy)
 
+    # 视频信息缓存设置
+    MetaDataCache.set_cache(enabled=not args.no_metadata_cache, refresh=args.refresh_metadata)
+
     # 大会员身份校验
     if not args.sessdata:
         Logger.info("未提供 SESSDATA，无法下载会员专享剧集哟～")